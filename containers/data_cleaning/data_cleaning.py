@@ -3,61 +3,101 @@ import sys
 import re
 import unicodedata
 
-def clean_data(text):
-    """
-    Clean and normalize text for further processing
-    - Normalizes unicode characters
-    - Removes special characters and symbols
-    - Normalizes whitespace and line breaks
-    - Converts text to lowercase for consistency
-    - Handles HTML entities and common web artifacts
-    - Preserves important sentence structures and formatting
-    - Standardizes formatting for lists and common patterns
-    """
+# HTML entities become a space and HTML tags are dropped, in a single pass
+_MARKUP = re.compile(r'(?P<entity>&[a-zA-Z]+;)|<[^>]+>')
+
+# Citation references like [1] or [2][dead link]. Matched only once the tags
+# are gone, since web markup wraps the brackets and their text in tags
+_CITATION = re.compile(r'\[\d+\](?:\[.*?\])?')
+
+# Section headers that might be from copied web content
+_SECTION_HEADERS = re.compile(r'^(?:See also|Main article):.*$', re.MULTILINE)
+
+# Typographic quotation marks and apostrophes mapped to their ASCII forms
+_QUOTES = str.maketrans({
+    '\u201c': '"', '\u201d': '"', '\u201e': '"',
+    '\u2018': "'", '\u2019': "'", '\u201a': "'",
+})
+
+# Special characters replaced by a space. The text is pure ASCII by the time
+# this is applied, so a translate table over the ASCII range covers every
+# character `[^\w\s.,?!:;\-()\[\]/"']` would match
+_SPECIAL_CHARS = str.maketrans({
+    c: ' ' for c in map(chr, range(128))
+    if not (c.isalnum() or c == '_' or c.isspace() or c in '.,?!:;-()[]/"\'')
+})
+
+_ABBREVIATION = re.compile(r'(\w)\.(\w)\.')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_BULLET_ITEM = re.compile(r'^\s*[\•\-\*]\s')
+_NUMBERED_ITEM = re.compile(r'^\s*(\d+)[\.\)]\s')
+
+def _markup_replacement(match):
+    return ' ' if match.lastgroup == 'entity' else ''
+
+def _normalize_text(text):
+    """Apply every cleaning step except capitalizing the first character"""
+    # Standardize quotation marks and apostrophes before the ASCII folding
+    # below, which would otherwise drop them
+    text = text.translate(_QUOTES)
+
     # Normalize unicode characters
     text = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('utf-8')
 
-    # Handle HTML entities (like &amp;, &quot;, etc.)
-    text = re.sub(r'&[a-zA-Z]+;', ' ', text)
-
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    # Handle HTML entities (like &amp;, &quot;, etc.) and HTML tags
+    text = _MARKUP.sub(_markup_replacement, text)
 
     # Clean up citation references like [1], [2], etc.
-    text = re.sub(r'\[\d+\](?:\[.*?\])?', '', text)
+    text = _CITATION.sub('', text)
 
     # Handle section headers that might be from copied web content
-    text = re.sub(r'^See also:.*$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^Main article:.*$', '', text, flags=re.MULTILINE)
-
-    # Standardize quotation marks and apostrophes
-    text = re.sub(r'["""]', '"', text)
-    text = re.sub(r"[''']", "'", text)
+    text = _SECTION_HEADERS.sub('', text)
 
     # Remove special characters but preserve sentence structure
-    text = re.sub(r'[^\w\s\.\,\?\!\:\;\-\(\)\[\]\/\"\']', ' ', text)
+    text = text.translate(_SPECIAL_CHARS)
 
     # Handle common abbreviations properly
-    text = re.sub(r'(\w)\.(\w)\.', r'\1\2', text)  # Replace e.g. with eg
+    text = _ABBREVIATION.sub(r'\1\2', text)  # Replace e.g. with eg
 
     # Normalize whitespace, keeping paragraph breaks
-    paragraphs = re.split(r'\n\s*\n', text)
-    paragraphs = [re.sub(r'\s+', ' ', p).strip() for p in paragraphs]
+    paragraphs = _PARAGRAPH_BREAK.split(text)
+    paragraphs = [' '.join(p.split()) for p in paragraphs]
     text = '\n\n'.join([p for p in paragraphs if p])
 
     # Detect and preserve list formats
     lines = text.split('\n')
     for i, line in enumerate(lines):
         # Convert common list markers to standardized format
-        if re.match(r'^\s*[\•\-\*]\s', line):
-            lines[i] = '• ' + re.sub(r'^\s*[\•\-\*]\s', '', line)
+        if _BULLET_ITEM.match(line):
+            lines[i] = '• ' + _BULLET_ITEM.sub('', line)
         # Handle numbered lists
-        elif re.match(r'^\s*\d+[\.\)]\s', line):
-            lines[i] = re.sub(r'^\s*(\d+)[\.\)]\s', r'\1. ', line)
+        elif _NUMBERED_ITEM.match(line):
+            lines[i] = _NUMBERED_ITEM.sub(r'\1. ', line)
 
     text = '\n'.join(lines)
 
-    text = text.lower()  # Convert text to lowercase for consistency
+    return text.lower()  # Convert text to lowercase for consistency
+
+def clean_data(text):
+    """
+    Clean and normalize text for further processing
+    - Normalizes unicode characters
+    - Removes special characters and symbols
+    - Normalizes whitespace and line breaks
+    - Converts text to lowercase for consistency
+    - Handles HTML entities and common web artifacts
+    - Preserves important sentence structures and formatting
+    - Standardizes formatting for lists and common patterns
+
+    Citations are removed after the HTML tags wrapped around them:
+
+    >>> clean_data('The claim was made.<sup><a href="#c">[12]</a></sup>'
+    ...            '<sup><span>[<i><a href="/w">dead link</a></i>]</span></sup> Next sentence.')
+    'The claim was made. next sentence.'
+    >>> clean_data('Cited.<sup>[<i>1</i>]</sup> Done.')
+    'Cited. done.'
+    """
+    text = _normalize_text(text)
 
     # Capitalize the first character if the text is not empty
     if text:
@@ -65,27 +105,69 @@ def clean_data(text):
 
     return text
 
+def iter_paragraphs(lines):
+    """Group an iterable of lines into blank-line separated paragraphs"""
+    paragraph = []
+    for line in lines:
+        if line.strip():
+            paragraph.append(line)
+        elif paragraph:
+            yield ''.join(paragraph)
+            paragraph = []
+    if paragraph:
+        yield ''.join(paragraph)
+
+def clean_stream(lines, out):
+    """
+    Clean text paragraph by paragraph, writing each result as it is produced.
+    Produces the same output as clean_data on the whole text, except for HTML
+    tags spanning a blank line, while only holding one paragraph in memory.
+    """
+    first = True
+    for paragraph in iter_paragraphs(lines):
+        cleaned = _normalize_text(paragraph)
+        if not cleaned:
+            continue
+        if first:
+            cleaned = cleaned[0].upper() + cleaned[1:]
+            first = False
+        else:
+            out.write('\n\n')
+        out.write(cleaned)
+
 if __name__ == "__main__":
-    # Read from stdin if no arguments provided
-    if len(sys.argv) > 1:
+    # Read from stdin if no arguments provided; "-" stands for stdin/stdout
+    if len(sys.argv) > 1 and sys.argv[1] != '-':
         try:
-            with open(sys.argv[1], 'r') as f:
-                data = f.read()
+            source = open(sys.argv[1], 'r')
         except Exception as e:
             print(f"Error reading input file: {e}", file=sys.stderr)
             sys.exit(1)
     else:
-        data = sys.stdin.read()
-
-    result = clean_data(data)
+        source = sys.stdin
 
     # Write to stdout or output file
-    if len(sys.argv) > 2:
+    if len(sys.argv) > 2 and sys.argv[2] != '-':
         try:
-            with open(sys.argv[2], 'w') as f:
-                f.write(result)
+            sink = open(sys.argv[2], 'w')
         except Exception as e:
             print(f"Error writing output file: {e}", file=sys.stderr)
             sys.exit(1)
     else:
-        print(result)
+        sink = sys.stdout
+
+    # Stream paragraph by paragraph so peak memory is bounded by the longest
+    # paragraph rather than the whole input
+    try:
+        clean_stream(source, sink)
+        # An explicit "-" gets exactly what would have been written to a file
+        if len(sys.argv) <= 2:
+            sink.write('\n')
+    except Exception as e:
+        print(f"Error cleaning data: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
@@ -2,39 +2,50 @@
 import sys
 import json
 import re
-from collections import Counter
 
 # Simple sentiment analysis using predefined word lists
 # In a real implementation, you might want to use a library like TextBlob or NLTK
 
-POSITIVE_WORDS = set([
+POSITIVE_WORDS = frozenset((
     'good', 'great', 'excellent', 'positive', 'wonderful', 'amazing', 'love', 
     'best', 'happy', 'pleasant', 'fantastic', 'perfect', 'better', 'nice'
-])
+))
 
-NEGATIVE_WORDS = set([
+NEGATIVE_WORDS = frozenset((
     'bad', 'terrible', 'awful', 'negative', 'horrible', 'hate', 'worst',
     'poor', 'sad', 'unpleasant', 'disappointing', 'worse', 'problem'
-])
+))
+
+# Deletion table for ASCII characters that are neither word characters nor
+# whitespace, i.e. what `[^\w\s]` strips from pure-ASCII text
+_ASCII_NONWORD_TABLE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128))
+    if not (c.isalnum() or c == '_' or c.isspace())
+))
+
+# Fallback for text containing non-ASCII punctuation
+_NONWORD = re.compile(r'[^\w\s]')
 
 def analyze_sentiment(text):
     """Analyze sentiment of the given text"""
     # Normalize and split text
-    words = re.sub(r'[^\w\s]', '', text.lower()).split()
+    text = text.lower()
+    if text.isascii():
+        words = text.translate(_ASCII_NONWORD_TABLE).split()
+    else:
+        words = _NONWORD.sub('', text).split()
     word_count = len(words)
     
     # Count positive and negative words
-    sentiment_counter = Counter()
+    pos_count = 0
+    neg_count = 0
     for word in words:
         if word in POSITIVE_WORDS:
-            sentiment_counter['positive'] += 1
+            pos_count += 1
         elif word in NEGATIVE_WORDS:
-            sentiment_counter['negative'] += 1
+            neg_count += 1
     
     # Calculate sentiment score (-1 to 1)
-    pos_count = sentiment_counter['positive']
-    neg_count = sentiment_counter['negative']
-    
     if word_count > 0:
         score = (pos_count - neg_count) / max(1, word_count * 0.1)  # Normalize
         score = max(min(score, 1.0), -1.0)  # Clamp between -1 and 1
@@ -49,18 +60,27 @@ def analyze_sentiment(text):
     }
 
 if __name__ == "__main__":
-    # Read from stdin if no arguments provided
-    if len(sys.argv) > 1:
-        with open(sys.argv[1], 'r') as f:
+    # Compact single-line JSON by default; --pretty indents it for reading
+    args = sys.argv[1:]
+    pretty = '--pretty' in args
+    if pretty:
+        args.remove('--pretty')
+
+    # Read from stdin if no arguments provided; "-" stands for stdin/stdout
+    if len(args) > 0 and args[0] != '-':
+        with open(args[0], 'r') as f:
             data = f.read()
     else:
         data = sys.stdin.read()
     
     result = analyze_sentiment(data)
+    output = json.dumps(result, indent=2 if pretty else None)
     
     # Write to stdout or output file
-    if len(sys.argv) > 2:
-        with open(sys.argv[2], 'w') as f:
-            f.write(json.dumps(result, indent=2))
+    if len(args) > 1 and args[1] != '-':
+        with open(args[1], 'w') as f:
+            f.write(output)
+    elif len(args) > 1:
+        sys.stdout.write(output)
     else:
-        print(json.dumps(result, indent=2))
+        print(output)
@@ -2,23 +2,62 @@
 import sys
 import re
 from collections import Counter
+from itertools import repeat
 import heapq
 
+# Common stop words left out of word frequencies
+STOP_WORDS = frozenset({'the', 'and', 'is', 'in', 'it', 'to', 'of', 'for', 'with', 'as', 'that', 'on', 'at', 'by', 'an', 'be', 'this', 'are'})
+
+_CITATION = re.compile(r'\[\d+\](?:\[.*?\])?')
+_NONWORD = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+_EXTRA_SPACES = re.compile(r'\s{2,}')
+# Whitespace after sentence-ending punctuation, unless it follows an
+# abbreviation like "e.g." or "Dr.". The cheap terminator check comes first so
+# most positions are rejected before the abbreviation lookbehinds run
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.?!])(?<!\w\.\w.)(?<![A-Z][a-z]\.)\s')
+
+# Common list patterns in articles
+_LIST_ITEM = re.compile(r'(?:(?:^|\n)([A-Z][a-z]+(?:\s+[a-z]+){1,3})(?:\s+))')
+
 def clean_citations(text):
     """Remove citation references like [10], [12][dead link]"""
-    return re.sub(r'\[\d+\](?:\[.*?\])?', '', text)
+    return _CITATION.sub('', text)
 
 def format_lists(text):
-    """Convert list-like structures to proper bulleted lists"""
-    # Common list patterns in articles
-    list_pattern = r'(?:(?:^|\n)([A-Z][a-z]+(?:\s+[a-z]+){1,3})(?:\s+))'
-    items = re.findall(list_pattern, text)
+    """Convert list-like structures to proper bulleted lists
+
+    Every detected item is removed from the prose once, including items that
+    are a prefix of a longer repeated item:
+
+    >>> text = ('Red fox Apple pie\\nBlue sky is x\\nRed fox Apple pie\\nBig dog ran Apple pie\\n'
+    ...         'Apple pie y z\\nBig dog ran x\\nRed fox Apple pie\\nApple pie y z')
+    >>> format_lists(text).split('\\n\\n')[0]
+    ' Apple pie Apple pie Apple pie Big dog ran x\\nRed fox Apple pie z'
+    """
+    items = _LIST_ITEM.findall(text)
     if len(items) > 3:  # If we have multiple short items that look like a list
         formatted_list = "\n• " + "\n• ".join(items)
-        # Replace the flat list with a bulleted list
-        for item in items:
-            text = text.replace(item, "", 1)  # Remove each item (first occurrence only)
-        text = re.sub(r'\s{2,}', ' ', text)  # Clean up extra spaces
+        # Replace the flat list with a bulleted list, removing each item once
+        # in a single scan over the text
+        remaining = Counter(items)
+        by_length = sorted(remaining, key=len, reverse=True)
+        item_pattern = re.compile('|'.join(map(re.escape, by_length)))
+        # The alternation prefers the longest item, so a match can hide a
+        # shorter item that is its prefix. Once the matched item has been
+        # removed, fall back to the longest prefix still to be removed.
+        candidates = {item: [other for other in by_length if item.startswith(other)] for item in by_length}
+
+        def remove_item(match):
+            item = match.group()
+            for candidate in candidates[item]:
+                if remaining[candidate]:
+                    remaining[candidate] -= 1
+                    return item[len(candidate):]
+            return item
+
+        text = item_pattern.sub(remove_item, text)
+        text = _EXTRA_SPACES.sub(' ', text)  # Clean up extra spaces
         text += "\n\n" + formatted_list
     return text
 
@@ -30,62 +69,59 @@ def improve_paragraph_structure(paragraph, max_length=80):
     words = paragraph.split()
     lines = []
     current_line = []
+    current_length = 0  # Characters in current_line, excluding separators
     for word in words:
-        current_length = sum(len(w) for w in current_line) + len(current_line)
-        if current_length + len(word) > max_length:
+        if current_line and current_length + len(current_line) + len(word) > max_length:
             lines.append(' '.join(current_line))
             current_line = [word]
+            current_length = len(word)
         else:
             current_line.append(word)
+            current_length += len(word)
     if current_line:
         lines.append(' '.join(current_line))
     return '\n'.join(lines)
 
 def extract_main_topics(text, count=5):
     """Extract main topics from text based on word frequency"""
-    words = re.sub(r'[^\w\s]', '', text.lower()).split()
+    words = _NONWORD.sub('', text.lower()).split()
     # Remove common stop words
-    stop_words = {'the', 'and', 'is', 'in', 'it', 'to', 'of', 'for', 'with', 'as', 'that', 'on', 'at', 'by', 'an', 'be', 'this', 'are'}
-    filtered_words = [w for w in words if w not in stop_words and len(w) > 3]
+    filtered_words = [w for w in words if w not in STOP_WORDS and len(w) > 3]
     return Counter(filtered_words).most_common(count)
 
 def summarize_text(text, num_sentences=3):
     # Clean and normalize text
     text = clean_citations(text)
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WHITESPACE.sub(' ', text).strip()
 
     # Split into sentences - more carefully to handle abbreviations
-    sentences = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s', text)
+    sentences = _SENTENCE_BOUNDARY.split(text)
     sentences = [s.strip() for s in sentences if s.strip()]
 
     if len(sentences) <= num_sentences:
         # For short texts, just format with line breaks
         return "\n\n".join([s for s in sentences if s])
 
-    # Calculate word frequency
-    words = re.sub(r'[^\w\s]', '', text.lower()).split()
-    word_freq = Counter(words)
+    # Tokenize each sentence once; the token lists feed both the word
+    # frequencies and the sentence scores below
+    sentence_tokens = [_NONWORD.sub('', s.lower()).split() for s in sentences]
 
-    # Remove common stop words from consideration
-    stop_words = {'the', 'and', 'is', 'in', 'it', 'to', 'of', 'for', 'with', 'as', 'that', 'on', 'at', 'by', 'an', 'be', 'this', 'are'}
-    for word in stop_words:
-        if word in word_freq:
-            del word_freq[word]
+    # Calculate word frequency, leaving common stop words out of consideration
+    word_freq = Counter(word for tokens in sentence_tokens for word in tokens if word not in STOP_WORDS)
 
     # Normalize word frequency
     max_freq = max(word_freq.values()) if word_freq else 1
     word_freq = {word: freq/max_freq for word, freq in word_freq.items()}
 
-    # Score sentences
-    sentence_scores = {}
-    for i, sentence in enumerate(sentences):
-        sentence_words = re.sub(r'[^\w\s]', '', sentence.lower()).split()
-        sentence_scores[i] = sum(word_freq.get(word, 0) for word in sentence_words)
+    # Score sentences; mapping the bound dict lookup over the tokens keeps the
+    # per-token work in C instead of a generator frame
+    lookup = word_freq.get
+    sentence_scores = [sum(map(lookup, tokens, repeat(0))) for tokens in sentence_tokens]
 
     # Get top sentences while maintaining original order
     top_indices = heapq.nlargest(num_sentences,
                                 range(len(sentences)),
-                                key=lambda i: sentence_scores[i])
+                                key=sentence_scores.__getitem__)
     top_indices = sorted(top_indices)
 
     # Build summary from top sentences
@@ -117,8 +153,8 @@ def summarize_text(text, num_sentences=3):
     return "\n\n".join(improved_paragraphs)
 
 if __name__ == "__main__":
-    # Read from stdin if no arguments provided
-    if len(sys.argv) > 1:
+    # Read from stdin if no arguments provided; "-" stands for stdin/stdout
+    if len(sys.argv) > 1 and sys.argv[1] != '-':
         try:
             with open(sys.argv[1], 'r') as f:
                 text = f.read()
@@ -140,12 +176,14 @@ if __name__ == "__main__":
     summary = summarize_text(text, num_sentences)
 
     # Write to stdout or output file
-    if len(sys.argv) > 2:
+    if len(sys.argv) > 2 and sys.argv[2] != '-':
         try:
             with open(sys.argv[2], 'w') as f:
                 f.write(summary)
         except Exception as e:
             print(f"Error writing output file: {e}", file=sys.stderr)
             sys.exit(1)
+    elif len(sys.argv) > 2:
+        sys.stdout.write(summary)
     else:
         print(summary)
@@ -1,32 +1,84 @@
 #!/usr/bin/env python3
 from flask import Flask, request, jsonify, render_template
 import os
+import json
 from orchestrator import Orchestrator  # Use local import
 
+try:
+    import orjson
+except ImportError:
+    # Fall back to Flask's stdlib-based JSON handling
+    orjson = None
+
 app = Flask(__name__)
 orchestrator = Orchestrator()
 
+def load_json_body():
+    """Parse the request body as JSON, returning None if it is not valid JSON"""
+    if orjson is None:
+        return request.get_json(silent=True)
+    try:
+        return orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return None
+
+def ojsonify(obj, status=200):
+    """Build a JSON response, serialized with orjson when it is available"""
+    if orjson is None:
+        return jsonify(obj), status
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
+def dumps(obj):
+    """Serialize to JSON bytes, with orjson when it is available"""
+    if orjson is None:
+        return json.dumps(obj).encode('utf-8')
+    return orjson.dumps(obj)
+
+def stream_output_response(result):
+    """Stream a result whose output was left in a file, then remove the file"""
+    output_path = result.pop('output_path')
+    # Reopen the serialized object to append the output as its last member
+    head = dumps(result)[:-1] + b',"output":"'
+
+    def generate():
+        yield head
+        with open(output_path, 'r') as f:
+            for chunk in iter(lambda: f.read(1 << 16), ''):
+                yield dumps(chunk)[1:-1]
+        yield b'"}'
+
+    response = app.response_class(generate(), mimetype='application/json')
+    response.call_on_close(lambda: os.remove(output_path))
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/process', methods=['POST'])
 def process():
-    data = request.json
+    data = load_json_body()
+    if not isinstance(data, dict):
+        return ojsonify({"error": "Request body must be a JSON object"}, 400)
+
     user_request = data.get('request')
     input_text = data.get('text')
 
     if not user_request or not input_text:
-        return jsonify({"error": "Request and input text are required"}), 400
+        return ojsonify({"error": "Request and input text are required"}, 400)
 
     try:
-        result = orchestrator.process_request(user_request, input_text)
-        return jsonify(result)
+        # Large outputs are streamed from disk rather than built into one string
+        result = orchestrator.process_request(user_request, input_text, keep_output_file=True)
+        if 'output_path' in result:
+            return stream_output_response(result)
+        return ojsonify(result)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, 500)
 
 if __name__ == '__main__':
     # Ensure the templates directory exists
     os.makedirs('templates', exist_ok=True)
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Development server only; run.sh serves the app with gunicorn
+    app.run(debug=os.getenv('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 import os
+import re
 import json
 import logging
 from dotenv import load_dotenv
 
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so parse errors are
+# handled the same way with either parser
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -61,6 +70,27 @@ class LLMDecisionEngine:
             "text-summarization": "Creates a concise summary of longer text by extracting key sentences"
         }
 
+        # Keywords used by the rule-based fallback to pick containers
+        self._clean_kw = frozenset(("clean", "remove"))
+        self._sent_kw = frozenset(("sentiment", "analyze", "feeling", "emotion", "positive", "negative"))
+        self._sum_kw = frozenset(("summarize", "summary", "shorten", "brief", "concise"))
+
+        # All keywords compiled into one pattern so a request is scanned once. The
+        # zero-width lookahead tries every position, so overlapping keywords are
+        # found exactly as with per-keyword substring checks
+        self._keyword_containers = (
+            ("clean", "data-cleaning", self._clean_kw),
+            ("sentiment", "sentiment-analysis", self._sent_kw),
+            ("summary", "text-summarization", self._sum_kw),
+        )
+        self._keyword_re = re.compile("(?=" + "|".join(
+            f"(?P<{group}>{'|'.join(sorted(map(re.escape, keywords)))})"
+            for group, _, keywords in self._keyword_containers
+        ) + ")")
+
+        # The system prompt only depends on the available containers, so build it once
+        self._system_prompt = self._build_system_prompt()
+
         # Log the operational mode
         if self.use_mock:
             logger.info("LLM Decision Engine initialized in MOCK mode")
@@ -83,33 +113,13 @@ class LLMDecisionEngine:
             text_sample = f"Sample of the input text: '{sample_text[:100]}...'"
             logger.debug(f"Including sample text snippet: {text_sample}")
 
-        # Build the system prompt
-        system_prompt = f"""You are an AI orchestrator that decides which containers to run based on user requests.
-
-Available containers:
-{self._format_container_descriptions()}
-
-Your task is to determine which containers should be executed and in what order based on the user's request.
-Return ONLY a valid JSON array of container names in execution order. Include only containers from the available list.
-
-Examples:
-User: "Clean this text and analyze its sentiment"
-Output: ["data-cleaning", "sentiment-analysis"]
-
-User: "Summarize this article"
-Output: ["text-summarization"]
-
-User: "Clean and summarize this text"
-Output: ["data-cleaning", "text-summarization"]
-"""
-
         try:
             logger.debug("Calling LLM API")
             # Call the LLM with timeout
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": self._system_prompt},
                     {"role": "user", "content": f"User request: {user_request}\n{text_sample}"}
                 ],
                 max_tokens=200,
@@ -123,7 +133,7 @@ Output: ["data-cleaning", "text-summarization"]
 
             try:
                 # Handle both array and object responses
-                result = json.loads(content)
+                result = _json_loads(content)
                 if isinstance(result, dict) and "containers" in result:
                     containers = result["containers"]
                 elif isinstance(result, list):
@@ -170,18 +180,17 @@ Output: ["data-cleaning", "text-summarization"]
         request_lower = user_request.lower()
         containers = []
 
-        # Simple keyword matching
-        if "clean" in request_lower or "remove" in request_lower:
-            containers.append("data-cleaning")
-            logger.debug("Mock: Adding data-cleaning container")
+        # Simple keyword matching in a single pass over the request
+        matched = set()
+        for match in self._keyword_re.finditer(request_lower):
+            matched.add(match.lastgroup)
+            if len(matched) == len(self._keyword_containers):
+                break
 
-        if any(word in request_lower for word in ["sentiment", "analyze", "feeling", "emotion", "positive", "negative"]):
-            containers.append("sentiment-analysis")
-            logger.debug("Mock: Adding sentiment-analysis container")
-
-        if any(word in request_lower for word in ["summarize", "summary", "shorten", "brief", "concise"]):
-            containers.append("text-summarization")
-            logger.debug("Mock: Adding text-summarization container")
+        for group, container, _ in self._keyword_containers:
+            if group in matched:
+                containers.append(container)
+                logger.debug(f"Mock: Adding {container} container")
 
         # If no containers matched or the request is ambiguous, use a default
         if not containers:
@@ -191,6 +200,27 @@ Output: ["data-cleaning", "text-summarization"]
         logger.info(f"Mock determination selected containers: {containers}")
         return containers
 
+    def _build_system_prompt(self):
+        """Build the system prompt describing the available containers"""
+        return f"""You are an AI orchestrator that decides which containers to run based on user requests.
+
+Available containers:
+{self._format_container_descriptions()}
+
+Your task is to determine which containers should be executed and in what order based on the user's request.
+Return ONLY a valid JSON array of container names in execution order. Include only containers from the available list.
+
+Examples:
+User: "Clean this text and analyze its sentiment"
+Output: ["data-cleaning", "sentiment-analysis"]
+
+User: "Summarize this article"
+Output: ["text-summarization"]
+
+User: "Clean and summarize this text"
+Output: ["data-cleaning", "text-summarization"]
+"""
+
     def _format_container_descriptions(self):
         """Format container descriptions for the prompt"""
         return "\n".join([f"- {name}: {desc}" for name, desc in self.available_containers.items()])
@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
 import os
 import sys
+import atexit
+import shutil
+import contextlib
 import tempfile
 import subprocess
 import json
 import re
 import logging
+import hashlib
+import threading
+import time
+import graphlib
 import concurrent.futures
+from collections import Counter, OrderedDict
 from datetime import datetime
 from llm_integration import LLMDecisionEngine  # Fixed import
 
+try:
+    import redis
+except ImportError:
+    # Routing decisions are then only cached per process
+    redis = None
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,34 +31,395 @@ logging.basicConfig(
 )
 logger = logging.getLogger('orchestrator')
 
+# Keep one long-lived container per image and `docker exec` stages into it
+WARM_CONTAINERS = os.getenv("AI_ORCH_WARM_CONTAINERS", "1") != "0"
+
+# Number of LLM routing decisions kept in memory (0 disables the cache)
+ROUTING_CACHE_SIZE = int(os.getenv("AI_ORCH_ROUTING_CACHE_SIZE", "1024"))
+# Optional Redis server sharing routing decisions between server workers
+ROUTING_CACHE_REDIS_URL = os.getenv("AI_ORCH_REDIS_URL")
+ROUTING_CACHE_TTL = int(os.getenv("AI_ORCH_ROUTING_CACHE_TTL", "3600"))
+
+# Number of container stage results kept in memory. Off by default, since
+# every server worker keeps its own copy (0 disables the cache)
+STAGE_CACHE_SIZE = int(os.getenv("AI_ORCH_STAGE_CACHE_SIZE", "0"))
+# Total characters of stage output one process keeps in memory, however many
+# entries that is
+STAGE_CACHE_TOTAL_CHARS = int(os.getenv("AI_ORCH_STAGE_CACHE_CHARS", str(16 << 20)))
+# Stage outputs longer than this many characters are not cached
+STAGE_CACHE_MAX_CHARS = 1 << 20
+# Optional directory where stage outputs are also stored, so they are shared
+# by all server workers and survive restarts; entries are never pruned
+STAGE_CACHE_DIR = os.getenv("AI_ORCH_STAGE_CACHE_DIR")
+# Seconds an image ID looked up for a one-shot stage is trusted, so a rebuilt
+# image stops matching cached outputs soon after it is tagged
+IMAGE_ID_TTL = float(os.getenv("AI_ORCH_IMAGE_ID_TTL", "30"))
+
+# Inputs up to this many characters are piped through the containers'
+# stdin/stdout instead of being written to files and bind-mounted
+STREAM_MAX_CHARS = int(os.getenv("AI_ORCH_STREAM_MAX_CHARS", str(4 << 20)))
+
+# Parent of the work directory holding pipeline files for inputs too large to
+# stream; a tmpfs keeps each stage's output out of the disk cache round trip
+WORK_DIR = os.getenv("AI_ORCH_WORK_DIR") or (
+    "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+)
+
+# File-mode outputs larger than this are handed to callers that ask for it as
+# a file instead of being read into the result
+LARGE_OUTPUT_BYTES = 1 << 20
+
+# Upper bound on stages running at once. Stages mostly wait on docker, so
+# allow a couple per CPU
+MAX_WORKERS = int(os.getenv("AI_ORCH_MAX_WORKERS", str(max(4, (os.cpu_count() or 2) * 2))))
+
+# Request parsing patterns, matched against the lowercased request
+_SUMMARY_RE = re.compile(r'summarize\s+.*?\s+to\s+(\d+)\s+sentences')
+# Boolean flags found in a single scan; each group is named after its parameter
+_FLAGS_RE = re.compile(
+    r'(?P<parallel_execution>parallel|concurrently)'
+    r'|(?P<no_cache>\b(?:no|without|skip)[\s-]+(?:the\s+)?cach)'
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Services whose only input is the output of these services. A stage of one of
+# them waits for the earlier stages in the plan that it depends on and runs
+# alongside the others; unlisted containers wait for every earlier stage.
+_DEPENDS_ON = {
+    "sentiment-analysis": {"data-cleaning"},
+    "text-summarization": {"data-cleaning"},
+}
+
 class Orchestrator:
-    def __init__(self):
+    def __init__(self, warm_containers=None):
         self.llm = LLMDecisionEngine()
         self.container_prefix = "ai-orchestrator"
+        # The services only transform text, so they get no network access
+        self._docker_run = ["docker", "run", "--rm", "--network=none"]
+
+        # Warm containers avoid paying container start-up on every stage. They
+        # see the pipeline files through a single work directory that is
+        # bind-mounted at the same path inside each of them.
+        self.warm_containers = WARM_CONTAINERS if warm_containers is None else warm_containers
+        self._work_root = os.path.realpath(tempfile.mkdtemp(prefix="ai-orchestrator-", dir=WORK_DIR))
+        self._warm = {}
+        self._warm_lock = threading.Lock()
+        self._owner_pid = os.getpid()
+        atexit.register(self.shutdown)
+
+        # Routing decisions keyed by the normalized request and input sample, so
+        # repeated requests skip the LLM round trip
+        self._routing_cache = OrderedDict()
+        self._routing_cache_lock = threading.Lock()
+        self._routing_redis = None
+        if ROUTING_CACHE_REDIS_URL:
+            if redis is None:
+                logger.warning("AI_ORCH_REDIS_URL is set but the redis package is not installed")
+            else:
+                # Connections are opened lazily, so this is safe before forking
+                self._routing_redis = redis.Redis.from_url(
+                    ROUTING_CACHE_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+                )
+
+        # The containers are deterministic, so a stage's output only depends on
+        # the container image, its arguments and its input
+        self._stage_cache = OrderedDict()
+        self._stage_cache_chars = 0
+        self._stage_cache_lock = threading.Lock()
+        self._image_ids = {}
+        if STAGE_CACHE_DIR:
+            os.makedirs(STAGE_CACHE_DIR, exist_ok=True)
+
+        # Shared by all requests so stage threads are not started and joined
+        # on every call; threads are only spawned on first use, after any fork
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="orch")
 
     def extract_parameters(self, user_request):
         """Extract parameters from the user request"""
         params = {}
+        request_lower = user_request.lower()
 
         # Extract summary length for text summarization
-        summary_length_match = re.search(r'summarize\s+.*?\s+to\s+(\d+)\s+sentences', user_request.lower())
+        summary_length_match = _SUMMARY_RE.search(request_lower)
         if summary_length_match:
             params['summary_length'] = int(summary_length_match.group(1))
 
         # Add more parameter extraction patterns as needed
 
-        # Check if user wants parallel execution
-        if "parallel" in user_request.lower() or "concurrently" in user_request.lower():
-            params['parallel_execution'] = True
+        # Check if user wants parallel execution, or every stage to run even
+        # if its output is cached
+        for match in _FLAGS_RE.finditer(request_lower):
+            params[match.lastgroup] = True
 
         return params
 
+    def _routing_key(self, user_request, sample_text):
+        """Build the routing cache key from the normalized request and a digest of the sample"""
+        normalized = _WHITESPACE_RE.sub(' ', user_request.lower()).strip()
+        sample_digest = hashlib.blake2b(sample_text.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{sample_digest}:{normalized}"
+
+    def _determine_containers(self, user_request, sample_text):
+        """Ask the LLM which containers to run, reusing earlier decisions for the same request"""
+        if ROUTING_CACHE_SIZE <= 0 and self._routing_redis is None:
+            return self.llm.determine_containers(user_request, sample_text)
+
+        key = self._routing_key(user_request, sample_text)
+        with self._routing_cache_lock:
+            containers = self._routing_cache.get(key)
+            if containers is not None:
+                self._routing_cache.move_to_end(key)
+        if containers is None:
+            containers = self._get_shared_route(key)
+            if containers is not None:
+                self._remember_route(key, containers)
+        if containers is not None:
+            logger.info(f"Reusing cached execution plan: {' -> '.join(containers)}")
+            return list(containers)
+
+        containers = self.llm.determine_containers(user_request, sample_text)
+        # Failed decisions are not cached so the next request asks again
+        if containers:
+            self._remember_route(key, containers)
+            self._set_shared_route(key, containers)
+        return containers
+
+    def _remember_route(self, key, containers):
+        """Store a routing decision in this process, evicting the least recently used"""
+        with self._routing_cache_lock:
+            self._routing_cache[key] = tuple(containers)
+            while len(self._routing_cache) > ROUTING_CACHE_SIZE:
+                self._routing_cache.popitem(last=False)
+
+    def _shared_route_key(self, key):
+        """Redis key for a routing decision; the request text itself can be long"""
+        return "route:" + hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _get_shared_route(self, key):
+        """Look up a routing decision made by any worker, or None"""
+        if self._routing_redis is None:
+            return None
+        try:
+            value = self._routing_redis.get(self._shared_route_key(key))
+            containers = json.loads(value) if value else None
+        except (redis.RedisError, ValueError) as e:
+            logger.warning(f"Shared routing cache lookup failed: {str(e)}")
+            return None
+        if not isinstance(containers, list) or not all(isinstance(c, str) for c in containers):
+            return None
+        return tuple(containers)
+
+    def _set_shared_route(self, key, containers):
+        """Publish a routing decision to the other workers"""
+        if self._routing_redis is None:
+            return
+        try:
+            self._routing_redis.setex(self._shared_route_key(key), ROUTING_CACHE_TTL, json.dumps(containers))
+        except redis.RedisError as e:
+            logger.warning(f"Shared routing cache update failed: {str(e)}")
+
+    def _container_args(self, container, params):
+        """Container-specific arguments passed after the input and output paths"""
+        if container == "text-summarization" and params and 'summary_length' in params:
+            return [str(params['summary_length'])]
+        return []
+
+    def _use_stage_cache(self, params):
+        """Whether stage outputs may be looked up and stored for this request"""
+        return (STAGE_CACHE_SIZE > 0 or bool(STAGE_CACHE_DIR)) and not (params and params.get('no_cache'))
+
+    def _image_id(self, container, warm=None):
+        """Return the ID of the image a stage runs, re-inspecting it after IMAGE_ID_TTL seconds"""
+        if warm:
+            # A warm container keeps running the image it was started from
+            return warm[2]
+        now = time.monotonic()
+        cached = self._image_ids.get(container)
+        if cached is not None and now - cached[1] < IMAGE_ID_TTL:
+            return cached[0]
+        try:
+            inspect = subprocess.run(
+                ["docker", "image", "inspect", "--format", "{{.Id}}", f"{self.container_prefix}/{container}"],
+                capture_output=True, text=True, check=True
+            )
+        except subprocess.CalledProcessError:
+            # The stage itself will report the missing image
+            return ""
+        image_id = inspect.stdout.strip()
+        self._image_ids[container] = (image_id, now)
+        return image_id
+
+    def _stage_cache_key(self, container, image_id, args, input_text=None, input_file=None):
+        """Key a stage by its image, arguments and a digest of its input"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps([container, image_id, args]).encode('utf-8'))
+        if input_file is None:
+            digest.update(input_text.encode('utf-8'))
+        else:
+            with open(input_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def _get_cached_stage(self, key):
+        """Return the cached output for a stage, or None"""
+        with self._stage_cache_lock:
+            output = self._stage_cache.get(key)
+            if output is not None:
+                self._stage_cache.move_to_end(key)
+                return output
+
+        if STAGE_CACHE_DIR:
+            try:
+                with open(os.path.join(STAGE_CACHE_DIR, key), 'r', encoding='utf-8') as f:
+                    output = f.read()
+            except FileNotFoundError:
+                return None
+            except OSError as e:
+                logger.warning(f"Could not read stage cache entry {key}: {str(e)}")
+                return None
+            self._cache_stage(key, output, store=False)
+        return output
+
+    def _cache_stage(self, key, output, store=True):
+        """Remember a stage output, evicting the least recently used entries"""
+        if len(output) > STAGE_CACHE_MAX_CHARS:
+            return
+        if STAGE_CACHE_SIZE > 0 and len(output) <= STAGE_CACHE_TOTAL_CHARS:
+            with self._stage_cache_lock:
+                previous = self._stage_cache.pop(key, None)
+                if previous is not None:
+                    self._stage_cache_chars -= len(previous)
+                self._stage_cache[key] = output
+                self._stage_cache_chars += len(output)
+                while (len(self._stage_cache) > STAGE_CACHE_SIZE
+                       or self._stage_cache_chars > STAGE_CACHE_TOTAL_CHARS):
+                    _, evicted = self._stage_cache.popitem(last=False)
+                    self._stage_cache_chars -= len(evicted)
+
+        if STAGE_CACHE_DIR and store:
+            # Write then rename so other workers never read a partial entry
+            path = os.path.join(STAGE_CACHE_DIR, key)
+            try:
+                with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=STAGE_CACHE_DIR, delete=False) as f:
+                    f.write(output)
+                os.replace(f.name, path)
+            except OSError as e:
+                logger.warning(f"Could not write stage cache entry {key}: {str(e)}")
+
+    def _warm_container(self, container):
+        """Return the name, entrypoint and image ID of a warm container, starting it on first use"""
+        with self._warm_lock:
+            if container in self._warm:
+                # None records an image that could not be kept warm
+                return self._warm[container]
+
+            image = f"{self.container_prefix}/{container}"
+            name = f"{self.container_prefix}-{container}-{os.getpid()}"
+            try:
+                # Record the ID the container is started from, since the tag
+                # may later move to a rebuilt image
+                inspect = subprocess.run(
+                    ["docker", "image", "inspect", "--format",
+                     '{"id": {{json .Id}}, "entrypoint": {{json .Config.Entrypoint}}}', image],
+                    capture_output=True, text=True, check=True
+                )
+                config = json.loads(inspect.stdout)
+                image_id, entrypoint = config["id"], config["entrypoint"]
+                if not entrypoint:
+                    raise ValueError(f"image {image} has no entrypoint")
+
+                # Remove a leftover container from an earlier process with the same pid
+                subprocess.run(["docker", "rm", "-f", name], capture_output=True, text=True)
+                subprocess.run(
+                    self._docker_run + [
+                        "-d", "--name", name,
+                        "-v", f"{self._work_root}:{self._work_root}",
+                        "--entrypoint", "sleep", image, "infinity"
+                    ],
+                    capture_output=True, text=True, check=True
+                )
+            except (subprocess.CalledProcessError, ValueError) as e:
+                error_msg = getattr(e, 'stderr', None) or str(e)
+                logger.warning(f"Could not start warm container for {container}, using docker run: {error_msg}")
+                self._warm[container] = None
+                return None
+
+            logger.info(f"Started warm container {name}")
+            self._warm[container] = (name, entrypoint, image_id)
+            return self._warm[container]
+
+    def _forget_warm_container(self, container):
+        """Drop a warm container that is no longer running so the next stage restarts it"""
+        with self._warm_lock:
+            self._warm.pop(container, None)
+
+    def _ran_warm(self, container, warm):
+        """Whether a stage started on `warm` ran there rather than falling back to docker run"""
+        with self._warm_lock:
+            return self._warm.get(container) is warm
+
+    def shutdown(self):
+        """Stop the stage threads and warm containers and remove the work directory"""
+        self._executor.shutdown(wait=False)
+        with self._warm_lock:
+            names = [warm[0] for warm in self._warm.values() if warm]
+            self._warm.clear()
+        if names:
+            subprocess.run(["docker", "rm", "-f"] + names, capture_output=True, text=True)
+        # Forked workers share the work directory with the process that created it
+        if os.getpid() == self._owner_pid:
+            shutil.rmtree(self._work_root, ignore_errors=True)
+
+    def _run_docker(self, container, warm, docker_cmd, one_shot_cmd, **kwargs):
+        """Run a stage command, falling back to `docker run` if the warm container is gone"""
+        kwargs.setdefault('stdout', subprocess.PIPE)
+        logger.info(f"Running Docker command: {' '.join(docker_cmd)}")
+        try:
+            return subprocess.run(docker_cmd, stderr=subprocess.PIPE, text=True, check=True, **kwargs)
+        except subprocess.CalledProcessError as e:
+            # The warm container may have been stopped behind our back; fall
+            # back to a one-shot run for this stage and restart it next time
+            if not warm or not any(marker in (e.stderr or '') for marker in ("No such container", "is not running")):
+                raise
+            logger.warning(f"Warm container {warm[0]} is gone, running {container} with docker run")
+            self._forget_warm_container(container)
+            logger.info(f"Running Docker command: {' '.join(one_shot_cmd)}")
+            return subprocess.run(one_shot_cmd, stderr=subprocess.PIPE, text=True, check=True, **kwargs)
+
     def _run_container(self, container, input_file, output_file, params=None):
         """Run a single container and return the results"""
         container_name = f"{self.container_prefix}/{container}"
         logger.info(f"Running container: {container}")
 
         try:
+            args = self._container_args(container, params)
+            input_path = os.path.abspath(input_file)
+            output_path = os.path.abspath(output_file)
+
+            # Prefer exec'ing into a warm container; the files live under the
+            # work directory it has mounted at the same path
+            warm = None
+            if self.warm_containers and input_path.startswith(self._work_root + os.sep):
+                warm = self._warm_container(container)
+
+            cache_key = None
+            if self._use_stage_cache(params):
+                cache_key = self._stage_cache_key(container, self._image_id(container, warm), args,
+                                                  input_file=input_file)
+                cached_output = self._get_cached_stage(cache_key)
+                if cached_output is not None:
+                    logger.info(f"Reusing cached output for container: {container}")
+                    with open(output_file, 'w') as f:
+                        f.write(cached_output)
+                    return {
+                        "container": container,
+                        "status": "success",
+                        "cached": True,
+                        "output_file": output_file,
+                        "output_preview": cached_output[:100] + "..." if len(cached_output) > 100 else cached_output
+                    }
+
             # Ensure the output file exists and is writable before mounting
             # This prevents Docker from mounting it as a directory
             with open(output_file, 'w') as f:
@@ -54,33 +429,40 @@ class Orchestrator:
             logger.info(f"Output file: {output_file}")
 
             # Build the docker command with specific file paths
-            docker_cmd = [
-                "docker", "run", "--rm",
-                "-v", f"{os.path.abspath(input_file)}:/app/input.txt",  # Use absolute paths
-                "-v", f"{os.path.abspath(output_file)}:/app/output.txt",  # Use absolute paths
+            one_shot_cmd = self._docker_run + [
+                "-v", f"{input_path}:/app/input.txt",  # Use absolute paths
+                "-v", f"{output_path}:/app/output.txt",  # Use absolute paths
                 container_name,
                 "/app/input.txt", "/app/output.txt"
             ]
 
             # Add container-specific parameters
-            if container == "text-summarization" and params and 'summary_length' in params:
-                docker_cmd.append(str(params['summary_length']))
-                logger.info(f"  Setting summary length to {params['summary_length']} sentences")
-
-            # Log the exact Docker command being run
-            logger.info(f"Running Docker command: {' '.join(docker_cmd)}")
+            if args:
+                one_shot_cmd.extend(args)
+                if container == "text-summarization":
+                    logger.info(f"  Setting summary length to {params['summary_length']} sentences")
+
+            if warm:
+                name, entrypoint, _ = warm
+                docker_cmd = ["docker", "exec", name] + entrypoint + [input_path, output_path] + args
+            else:
+                docker_cmd = one_shot_cmd
 
-            # Run the container
-            result = subprocess.run(
-                docker_cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            # Run the container; its output goes to the file, so only stderr
+            # is kept for error reporting
+            self._run_docker(container, warm, docker_cmd, one_shot_cmd, stdout=subprocess.DEVNULL)
+            if warm and not self._ran_warm(container, warm):
+                # The fallback ran whatever image the tag points at now
+                cache_key = None
 
-            # Read output for logging
+            # Read the whole output only when it can be cached; the preview
+            # needs just its first 101 characters
             with open(output_file, 'r') as f:
-                output_content = f.read()
+                if cache_key is not None and os.fstat(f.fileno()).st_size <= STAGE_CACHE_MAX_CHARS:
+                    output_content = f.read()
+                    self._cache_stage(cache_key, output_content)
+                else:
+                    output_content = f.read(101)
 
             return {
                 "container": container,
@@ -109,14 +491,104 @@ class Orchestrator:
                 "error": str(e)
             }
 
+    def _run_container_streamed(self, container, input_text, params=None):
+        """Run a single container over stdin/stdout and return the results and its output"""
+        container_name = f"{self.container_prefix}/{container}"
+        logger.info(f"Running container: {container} (streamed)")
+
+        try:
+            args = self._container_args(container, params)
+            warm = self._warm_container(container) if self.warm_containers else None
+            cache_key = None
+            if self._use_stage_cache(params):
+                cache_key = self._stage_cache_key(container, self._image_id(container, warm), args,
+                                                  input_text=input_text)
+                cached_output = self._get_cached_stage(cache_key)
+                if cached_output is not None:
+                    logger.info(f"Reusing cached output for container: {container}")
+                    return {
+                        "container": container,
+                        "status": "success",
+                        "cached": True,
+                        "output_preview": cached_output[:100] + "..." if len(cached_output) > 100 else cached_output
+                    }, cached_output
+
+            if args and container == "text-summarization":
+                logger.info(f"  Setting summary length to {params['summary_length']} sentences")
+
+            # "-" tells the container scripts to use stdin/stdout, so nothing
+            # needs to be mounted and no files are written on the host
+            one_shot_cmd = self._docker_run + ["-i", container_name, "-", "-"] + args
+
+            if warm:
+                name, entrypoint, _ = warm
+                docker_cmd = ["docker", "exec", "-i", name] + entrypoint + ["-", "-"] + args
+            else:
+                docker_cmd = one_shot_cmd
+
+            # Run the container
+            completed = self._run_docker(container, warm, docker_cmd, one_shot_cmd,
+                                         input=input_text, encoding='utf-8')
+            output_content = completed.stdout
+            if warm and not self._ran_warm(container, warm):
+                # The fallback ran whatever image the tag points at now
+                cache_key = None
+
+            if cache_key is not None:
+                self._cache_stage(cache_key, output_content)
+
+            return {
+                "container": container,
+                "status": "success",
+                "output_preview": output_content[:100] + "..." if len(output_content) > 100 else output_content
+            }, output_content
+
+        except subprocess.CalledProcessError as e:
+            # Handle container execution error
+            error_msg = e.stderr if e.stderr else "Unknown error occurred"
+            logger.error(f"Error running container {container}: {error_msg}")
+
+            return {
+                "container": container,
+                "status": "error",
+                "error": error_msg
+            }, None
+        except Exception as e:
+            # Handle other exceptions
+            logger.error(f"Unexpected error running container {container}: {str(e)}")
+
+            return {
+                "container": container,
+                "status": "error",
+                "error": str(e)
+            }, None
+
     def _can_run_in_parallel(self, containers):
         """Determine if the given containers can be run in parallel"""
-        # For now, we'll only run containers in parallel if they're all the same type
-        # In a more advanced implementation, this could use a dependency graph
+        # Copies of the same container only run side by side when asked to
         return len(set(containers)) == 1
 
-    def process_request(self, user_request, input_text=None, input_file=None):
-        """Process a user request by determining and running containers"""
+    def _stage_dependencies(self, containers, params):
+        """Return, for each stage, the indices of the earlier stages it waits for"""
+        if params.get('parallel_execution', False) and self._can_run_in_parallel(containers):
+            # Every copy processes the original input
+            return [[] for _ in containers]
+
+        dependencies = []
+        for i, container in enumerate(containers):
+            required = _DEPENDS_ON.get(container)
+            dependencies.append([
+                j for j in range(i)
+                if required is None or containers[j] in required or containers[j] == container
+            ])
+        return dependencies
+
+    def process_request(self, user_request, input_text=None, input_file=None, keep_output_file=False):
+        """Process a user request by determining and running containers
+
+        With keep_output_file, a large output is left in a file named by the
+        result's "output_path" in place of "output"; the caller removes it.
+        """
         logger.info(f"Processing request: {user_request}")
 
         # Extract parameters from the request
@@ -136,104 +608,125 @@ class Orchestrator:
             return {"error": "No input text provided"}
 
         # Use LLM to determine which containers to run
-        containers = self.llm.determine_containers(user_request, input_text[:100])
+        containers = self._determine_containers(user_request, input_text[:100])
         if not containers:
             logger.error("Could not determine which containers to run")
             return {"error": "Could not determine which containers to run"}
 
         logger.info(f"Execution plan: {' -> '.join(containers)}")
 
-        # Create temporary directory for intermediate files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Write input to initial file
-            initial_input = os.path.join(temp_dir, "input.txt")
-            with open(initial_input, 'w') as f:
-                f.write(input_text)
-
-            results = []
-            start_time = datetime.now()
-
-            # Determine if we should use parallel execution
-            use_parallel = (
-                params.get('parallel_execution', False) and
-                len(containers) > 1 and
-                self._can_run_in_parallel(containers)
-            )
+        # Small inputs are piped through the containers' stdin/stdout; larger
+        # ones are staged in files under the work directory shared with the
+        # warm containers
+        streamed = len(input_text) <= STREAM_MAX_CHARS
+        workspace = contextlib.nullcontext() if streamed else tempfile.TemporaryDirectory(dir=self._work_root)
 
-            if use_parallel:
-                logger.info(f"Running {len(containers)} containers in parallel")
-
-                # Prepare input files and output files for each container
-                container_files = {}
-                for i, container in enumerate(containers):
-                    container_files[container] = {
-                        'input': initial_input,
-                        'output': os.path.join(temp_dir, f"output_{i}.txt")
-                    }
-
-                # Run containers in parallel using ThreadPoolExecutor
-                with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(containers), 5)) as executor:
-                    future_to_container = {
-                        executor.submit(
-                            self._run_container,
-                            container,
-                            container_files[container]['input'],
-                            container_files[container]['output'],
-                            params
-                        ): container for container in containers
-                    }
-
-                    # Collect results as they complete
-                    for future in concurrent.futures.as_completed(future_to_container):
-                        container = future_to_container[future]
-                        try:
-                            result = future.result()
-                            results.append(result)
-                        except Exception as e:
-                            logger.error(f"Container {container} generated an exception: {str(e)}")
-                            results.append({
-                                "container": container,
-                                "status": "error",
-                                "error": str(e)
-                            })
-
-                # For parallel execution, we use the output from the last container in the list
-                # This is a simplification - in a real system, you might want a smarter way to merge results
-                final_output_file = container_files[containers[-1]]['output']
+        with workspace as temp_dir:
+            if streamed:
+                initial_input = input_text
 
+                def run_stage(i, container, stage_input):
+                    return self._run_container_streamed(container, stage_input, params)
             else:
-                logger.info("Running containers sequentially")
-                # Execute containers in sequence (original behavior)
-                current_input = initial_input
+                # Write input to initial file
+                initial_input = os.path.join(temp_dir, "input.txt")
+                with open(initial_input, 'w') as f:
+                    f.write(input_text)
 
-                for i, container in enumerate(containers):
+                def run_stage(i, container, stage_input):
                     output_file = os.path.join(temp_dir, f"output_{i}.txt")
+                    return self._run_container(container, stage_input, output_file, params), output_file
 
-                    result = self._run_container(container, current_input, output_file, params)
-                    results.append(result)
+            results = [None] * len(containers)
+            start_time = datetime.now()
+
+            # Stages start as soon as the stages they depend on have finished,
+            # so independent stages fan out over the thread pool; each stage
+            # reads the output of the latest stage it depends on
+            dependencies = self._stage_dependencies(containers, params)
+            sorter = graphlib.TopologicalSorter({i: deps for i, deps in enumerate(dependencies)})
+            sorter.prepare()
+
+            # Stage outputs by index, with -1 for the request input. An output
+            # is released once the stages reading it have finished and a later
+            # stage has produced its own, so only the live intermediates are
+            # held in memory or kept in the work directory
+            outputs = {-1: initial_input}
+            sources = [deps[-1] if deps else -1 for deps in dependencies]
+            readers = Counter(sources)
+            use_parallel = False
+            failed = False
+
+            pending = {}
+            while sorter.is_active():
+                ready = () if failed else sorter.get_ready()
+                if len(ready) + len(pending) > 1:
+                    use_parallel = True
+                for i in ready:
+                    pending[self._executor.submit(run_stage, i, containers[i], outputs[sources[i]])] = i
+                if not pending:
+                    break
+
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    container = containers[i]
+                    try:
+                        result, stage_output = future.result()
+                    except Exception as e:
+                        logger.error(f"Container {container} generated an exception: {str(e)}")
+                        result, stage_output = {
+                            "container": container,
+                            "status": "error",
+                            "error": str(e)
+                        }, None
+                    results[i] = result
+                    readers[sources[i]] -= 1
 
                     if result["status"] == "error":
+                        # Let running stages finish but start no new ones
                         logger.error(f"Container {container} failed, stopping execution")
-                        break
+                        failed = True
+                    else:
+                        outputs[i] = stage_output
+                        sorter.done(i)
+
+                latest = max(outputs)
+                for j in [j for j in outputs if j < latest and not readers[j]]:
+                    stage_output = outputs.pop(j)
+                    if not streamed:
+                        os.remove(stage_output)
 
-                    # Set this output as the next input
-                    current_input = output_file
+            logger.info(f"Ran {len(containers)} containers {'in parallel' if use_parallel else 'sequentially'}")
+            results = [result for result in results if result is not None]
 
-                final_output_file = current_input
+            # The output of the last stage in the plan that completed
+            final_output = outputs[max(outputs)]
 
             # Calculate execution time
             execution_time = (datetime.now() - start_time).total_seconds()
 
             # Read final output
-            final_output = ""
-            try:
-                with open(final_output_file, 'r') as f:
-                    final_output = f.read()
-            except Exception as e:
-                logger.error(f"Error reading final output: {str(e)}")
+            output_path = None
+            if streamed:
+                final_output = final_output or ""
+            else:
+                final_output_file = final_output
+                final_output = ""
+                try:
+                    if keep_output_file and os.path.getsize(final_output_file) > LARGE_OUTPUT_BYTES:
+                        # Move it out of the request directory before that is removed
+                        fd, output_path = tempfile.mkstemp(prefix="output-", suffix=".txt", dir=self._work_root)
+                        os.close(fd)
+                        os.replace(final_output_file, output_path)
+                    else:
+                        with open(final_output_file, 'r') as f:
+                            final_output = f.read()
+                except Exception as e:
+                    logger.error(f"Error reading final output: {str(e)}")
 
             # Return results
-            return {
+            result = {
                 "request": user_request,
                 "execution_plan": containers,
                 "execution_time": execution_time,
@@ -242,6 +735,10 @@ class Orchestrator:
                 "output": final_output,
                 "parameters": params  # Include extracted parameters in the response
             }
+            if output_path is not None:
+                del result["output"]
+                result["output_path"] = output_path
+            return result
 
 # Command-line interface
 if __name__ == "__main__":
@@ -253,15 +750,21 @@ if __name__ == "__main__":
     group.add_argument("--input-text", "-t", help="Input text directly")
     parser.add_argument("--output-file", "-o", help="Path to output file")
     parser.add_argument("--parallel", "-p", action="store_true", help="Run containers in parallel when possible")
+    parser.add_argument("--no-cache", action="store_true", help="Run every container even if its output is cached")
     args = parser.parse_args()
 
     # If parallel flag is specified, add it to the request
     request = args.request
     if args.parallel:
         request += " (run in parallel)"
+    if args.no_cache:
+        request += " (no cache)"
 
-    orchestrator = Orchestrator()
-    result = orchestrator.process_request(request, args.input_text, args.input_file)
+    # A single CLI run would pay for starting the warm containers without
+    # reusing them, so use one-shot `docker run` stages
+    orchestrator = Orchestrator(warm_containers=False)
+    result = orchestrator.process_request(request, args.input_text, args.input_file, keep_output_file=True)
+    output_path = result.pop('output_path', None)
 
     # Print results
     print("\n=== Execution Results ===")
@@ -274,7 +777,7 @@ if __name__ == "__main__":
     if 'parameters' in result and result['parameters']:
         print("\nParameters:")
         for param, value in result['parameters'].items():
-            if param != 'parallel_execution':  # Don't show internal parameters
+            if param not in ('parallel_execution', 'no_cache'):  # Don't show internal parameters
                 print(f"  {param}: {value}")
 
     print("\nContainer Results:")
@@ -283,11 +786,24 @@ if __name__ == "__main__":
         print(f"{status} {r['container']}")
 
     print("\nOutput:")
-    output = result.get('output', '')
+    if output_path:
+        # Large outputs stay in a file; only the shown part is read
+        with open(output_path, 'r') as f:
+            output = f.read(1001)
+    else:
+        output = result.get('output', '')
     print(output[:1000] + "..." if len(output) > 1000 else output)
 
-    # Save to output file if specified
-    if args.output_file and 'output' in result:
-        with open(args.output_file, 'w') as f:
-            f.write(result['output'])
-        print(f"\nOutput saved to {args.output_file}")
\ No newline at end of file
+    # Save to output file if specified. The output is put next to it first and
+    # renamed into place, so an interrupted run never leaves a partial file.
+    if args.output_file and (output_path or 'output' in result):
+        temp_output_file = args.output_file + ".tmp"
+        if output_path:
+            shutil.move(output_path, temp_output_file)
+        else:
+            with open(temp_output_file, 'w') as f:
+                f.write(result['output'])
+        os.replace(temp_output_file, args.output_file)
+        print(f"\nOutput saved to {args.output_file}")
+    elif output_path:
+        os.remove(output_path)
\ No newline at end of file
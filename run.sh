@@ -9,11 +9,33 @@ if ! command -v docker &> /dev/null; then
     exit 1
 fi
 
-# Build all containers
+# Build all containers in parallel. Each build logs to its own file, which is
+# only shown if that build fails.
+# Set AI_ORCH_BUILD_CACHE to an image repository (e.g. ghcr.io/<org>) to reuse
+# layers from the ai-orchestrator-<service>:cache images pushed there by an
+# earlier build, such as a previous CI run.
 echo "Building containers..."
-docker build -t ai-orchestrator/data-cleaning containers/data_cleaning/
-docker build -t ai-orchestrator/sentiment-analysis containers/sentiment_analysis/
-docker build -t ai-orchestrator/text-summarization containers/text_summarization/
+export DOCKER_BUILDKIT=${DOCKER_BUILDKIT:-1}
+SERVICES=(data-cleaning sentiment-analysis text-summarization)
+BUILD_LOGS=$(mktemp -d)
+PIDS=()
+for SERVICE in "${SERVICES[@]}"; do
+    CACHE_ARGS=()
+    if [ -n "$AI_ORCH_BUILD_CACHE" ]; then
+        CACHE_ARGS=(--cache-from "$AI_ORCH_BUILD_CACHE/ai-orchestrator-$SERVICE:cache" --build-arg BUILDKIT_INLINE_CACHE=1)
+    fi
+    docker build "${CACHE_ARGS[@]}" -t "ai-orchestrator/$SERVICE" "containers/${SERVICE//-/_}/" > "$BUILD_LOGS/$SERVICE.log" 2>&1 &
+    PIDS+=("$!")
+done
+for i in "${!SERVICES[@]}"; do
+    if wait "${PIDS[$i]}"; then
+        echo "Built ai-orchestrator/${SERVICES[$i]}"
+    else
+        echo "Error: failed to build ai-orchestrator/${SERVICES[$i]}"
+        cat "$BUILD_LOGS/${SERVICES[$i]}.log"
+    fi
+done
+rm -rf "$BUILD_LOGS"
 
 # Check if .env file exists
 if [ ! -f .env ]; then
@@ -25,4 +47,12 @@ fi
 # Run the web application
 echo "Starting the web server..."
 cd orchestrator
-python3 app.py
\ No newline at end of file
+if command -v gunicorn &> /dev/null; then
+    # Threaded workers suit /process, which spends its time waiting on the LLM
+    # API and Docker. --preload builds the Orchestrator once before forking.
+    WORKERS=${WEB_CONCURRENCY:-$(nproc)}
+    exec gunicorn --preload -w "$WORKERS" -k gthread --threads 8 --timeout 120 -b 0.0.0.0:5000 app:app
+else
+    echo "Warning: gunicorn not found, falling back to the Flask development server"
+    python3 app.py
+fi
\ No newline at end of file